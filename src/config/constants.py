@@ -1,4 +1,8 @@
 from decimal import Decimal
 
 DEFAULT_PAGINATION_SIZE = 10
+STREAM_CHUNK_SIZE = 500
+BULK_CREATE_BATCH_SIZE = 500
+BULK_CREATE_MAX_ITEMS = 1000
+CATEGORY_NAME_MAP_TIMEOUT = 300
 LOSS_FACTOR = Decimal("0.95")
@@ -1,13 +1,38 @@
-from typing import Optional
-from store import models as app_models
+from copy import copy
+from typing import Any
+from django.db import models
+from rest_framework.fields import Field
 
 
-class DiscountPriceMixin:
-    @staticmethod
-    def get_discounted_price(obj: app_models.Product) -> Optional[float]:
+class CachedFieldsMixin:
+    _fields_cache: dict[type, dict[str, Field]] = {}
+
+    def get_fields(self) -> dict[str, Field]:
+        """
+        Builds the serializer fields once per class and hands out shallow copies,
+        which are then bound to the current serializer instance.
+        """
+        cls = type(self)
+        fields = CachedFieldsMixin._fields_cache.get(cls)
+        if fields is None:
+            fields = CachedFieldsMixin._fields_cache[cls] = super().get_fields()
+        return {name: copy(field) for name, field in fields.items()}
+
+
+class InstanceUpdateMixin:
+    def update(
+        self, instance: models.Model, validated_data: dict[str, Any]
+    ) -> models.Model:
         """
-        Calculates the discounted price of a product.
+        Assigns the validated values to the instance and saves only the changed columns.
         """
-        if obj.discount:
-            return obj.price - (obj.price * obj.discount / 100)
-        return None
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Fields with auto_now are refreshed on every save and must be written too
+        auto_now_fields = [
+            field.name
+            for field in instance._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        instance.save(update_fields=[*validated_data, *auto_now_fields])
+        return instance
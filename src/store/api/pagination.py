@@ -0,0 +1,6 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Keyset pagination: pages are fetched by primary key without OFFSET or COUNT queries.
+class ProductCursorPagination(CursorPagination):
+    ordering = "id"
@@ -0,0 +1,28 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders responses with orjson. Values orjson does not handle natively, such as Decimal
+    and datetime, are converted by DRF's JSONEncoder, and U+2028 and U+2029 are escaped as
+    JSONRenderer does, so the output stays the same.
+    Non-string dict keys, such as list indexes in validation errors, are rendered as
+    strings. NaN and infinity are rendered as null, where JSONRenderer raises an error.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=self.encoder.default, option=option)
+        # These line separators are valid JSON but not valid JavaScript string content
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
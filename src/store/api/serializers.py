@@ -1,38 +1,52 @@
 from decimal import Decimal
 from typing import Union
 from rest_framework import serializers
-from mixins import DiscountPriceMixin
+from config.constants import BULK_CREATE_MAX_ITEMS
+from mixins import CachedFieldsMixin, InstanceUpdateMixin
+from store.cache import get_category_name_map
+from store.models import Product
 from validators import validate_price
 
 
 # Serializer for listing products.
-class ProductSearchSerializer(DiscountPriceMixin, serializers.Serializer):
+class ProductSearchSerializer(CachedFieldsMixin, serializers.Serializer):
     name = serializers.CharField(read_only=True)
     price = serializers.FloatField(read_only=True)
     discount = serializers.IntegerField(read_only=True)
-    discounted_price = serializers.SerializerMethodField(read_only=True)
+    discounted_price = serializers.FloatField(read_only=True, allow_null=True)
 
 
 # Serializer for retrieving a product.
-class ProductDetailSerializer(DiscountPriceMixin, serializers.Serializer):
+class ProductDetailSerializer(CachedFieldsMixin, serializers.Serializer):
     name = serializers.CharField(read_only=True)
-    category = serializers.CharField(source="category.name", read_only=True)
+    category = serializers.SerializerMethodField(read_only=True)
     price = serializers.FloatField(read_only=True)
-    discounted_price = serializers.SerializerMethodField(read_only=True)
+    discounted_price = serializers.FloatField(read_only=True, allow_null=True)
     discount = serializers.IntegerField(read_only=True)
     quantity = serializers.IntegerField(read_only=True)
     created_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M")
     updated_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M")
 
+    @staticmethod
+    def get_category(obj: Product) -> str:
+        """
+        Takes the category name from the cached category names instead of joining the category table.
+        """
+        category_name = get_category_name_map().get(obj.category_id)
+        if category_name is None:
+            # The category was created after the names were cached in this process
+            return obj.category.name
+        return category_name
+
 
-class ProductSerializer(serializers.Serializer):
+class ProductSerializer(CachedFieldsMixin, InstanceUpdateMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(max_length=50)
     category_id = serializers.IntegerField(
         help_text="ID of the category. Use the 'v1/categories/search' endpoint to get available categories.",
     )
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
-    quantity = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
     discount = serializers.IntegerField(default=0)
     available = serializers.BooleanField(default=True)
     cost_price = serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -54,15 +68,34 @@ class ProductSerializer(serializers.Serializer):
         )  # Call a function that checks the correctness of the price.
         return attrs
 
+    def create(self, validated_data: dict[str, Union[Decimal, int]]) -> Product:
+        """
+        Creates a product from the validated data.
+        """
+        return Product.objects.create(**validated_data)
+
+
+# Serializer for creating several products in one request.
+class ProductBulkCreateSerializer(serializers.Serializer):
+    items = ProductSerializer(
+        many=True, allow_empty=False, max_length=BULK_CREATE_MAX_ITEMS
+    )
+
+
+# Serializer describing the response of a bulk create.
+class ProductBulkCreateResultSerializer(serializers.Serializer):
+    created = serializers.ListField(child=serializers.CharField(), read_only=True)
+    skipped = serializers.ListField(child=serializers.CharField(), read_only=True)
+
 
-class ProductPartialUpdateSerializer(serializers.Serializer):
+class ProductPartialUpdateSerializer(InstanceUpdateMixin, serializers.Serializer):
     name = serializers.CharField(max_length=50, required=False)
     category_id = serializers.IntegerField(
         help_text="ID of the category. Use the /categories/ endpoint to get available categories.",
         required=False,
     )
     price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
-    quantity = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
     discount = serializers.IntegerField(default=0, required=False)
     available = serializers.BooleanField(default=True, required=False)
     cost_price = serializers.DecimalField(
@@ -88,6 +121,6 @@ class ProductPartialUpdateSerializer(serializers.Serializer):
 
 
 # Serializer for handling Create, Read, and Delete operations on Category objects.
-class CategorySerializer(serializers.Serializer):
+class CategorySerializer(CachedFieldsMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(max_length=100)
@@ -1,16 +1,25 @@
-from django.core.exceptions import ObjectDoesNotExist
+from typing import Any, Iterator, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DecimalField, F, QuerySet, When
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework import viewsets, status, generics, mixins
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from config.constants import BULK_CREATE_BATCH_SIZE, STREAM_CHUNK_SIZE
 from store.api.filters import ProductFilter
+from store.api.pagination import ProductCursorPagination
+from store.api.renderers import ORJSONRenderer
 from permissions import IsAdmin
 from store.models import Product, Category
 from store.api.serializers import (
     CategorySerializer,
+    ProductBulkCreateResultSerializer,
+    ProductBulkCreateSerializer,
     ProductSerializer,
     ProductDetailSerializer,
     ProductSearchSerializer,
@@ -18,6 +27,83 @@ from store.api.serializers import (
 )
 
 
+# Parameters for filtering products
+CATEGORY_PARAMETER = OpenApiParameter(
+    name="category",
+    location=OpenApiParameter.QUERY,
+    description="Filter products by category. Use commas to specify multiple categories.",
+    type=str,
+)
+MIN_PRICE_PARAMETER = OpenApiParameter(
+    name="min_price",
+    location=OpenApiParameter.QUERY,
+    description="Filter products by minimum price.",
+    type=float,
+)
+MAX_PRICE_PARAMETER = OpenApiParameter(
+    name="max_price",
+    location=OpenApiParameter.QUERY,
+    description="Filter products by maximum price.",
+    type=float,
+)
+NAME_PARAMETER = OpenApiParameter(
+    name="name",
+    location=OpenApiParameter.QUERY,
+    description="Filter products by name. Search is case-insensitive.",
+    type=str,
+)
+STREAM_PARAMETER = OpenApiParameter(
+    name="stream",
+    location=OpenApiParameter.QUERY,
+    description="Stream all matching products as a single JSON array without pagination.",
+    type=bool,
+)
+
+# Responses of the product search endpoints
+PRODUCT_LIST_RESPONSE = OpenApiResponse(
+    ProductSearchSerializer, description="List of products."
+)
+PRODUCT_DETAIL_RESPONSE = OpenApiResponse(
+    ProductDetailSerializer, description="Product details."
+)
+
+
+# Price after applying the discount, computed by the database; NULL when there is no discount
+DISCOUNTED_PRICE = Case(
+    When(discount=0, then=None),
+    default=F("price") * (100 - F("discount")) / 100,
+    output_field=DecimalField(),
+)
+
+
+def product_integrity_error_response(
+    error: IntegrityError,
+    validated_data: dict[str, Any],
+    product_id: Optional[int] = None,
+) -> Response:
+    """
+    Builds the error response for a product write rejected by a database constraint.
+    Only a failed write pays for finding out which constraint was violated; errors that
+    neither a missing category nor a taken name explain are re-raised.
+    """
+    category_id = validated_data.get("category_id")
+    if category_id is not None and not Category.objects.filter(id=category_id).exists():
+        return Response(
+            {"message": "This category doesn't exist."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    name = validated_data.get("name")
+    if (
+        name is not None
+        and Product.objects.filter(name=name).exclude(pk=product_id).exists()
+    ):
+        return Response(
+            {"message": "A product with the same name already exists."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    raise error
+
+
 class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
     """
     A view set for searching products.
@@ -26,60 +112,102 @@ class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = ProductFilter
+    pagination_class = ProductCursorPagination
+    action_serializers = {
+        "list": ProductSearchSerializer,
+        "retrieve": ProductDetailSerializer,
+    }
+    # Columns read by each action, the discounted price is annotated separately
+    list_fields = ("id", "name", "price", "discount")
+    retrieve_fields = (
+        "id",
+        "name",
+        "price",
+        "discount",
+        "quantity",
+        "created_at",
+        "updated_at",
+        "category",
+    )
+
+    # Load only the columns required by the serializer of the current action
+    def get_queryset(self):
+        queryset = super().get_queryset().annotate(discounted_price=DISCOUNTED_PRICE)
+        if self.action == "list":
+            return queryset.only(*self.list_fields)
+        return queryset.only(*self.retrieve_fields)
 
     # Select serializer based on the action
     def get_serializer_class(self):
-        action_serializers_dict = {
-            "list": ProductSearchSerializer,
-            "retrieve": ProductDetailSerializer,
-        }
-        serializer = action_serializers_dict.get(self.action)
-        if not serializer:
-            raise Exception(f"Serializer for {self.action=} is not exist")
-        return serializer
-
-    # Parameters for filtering products
-    CATEGORY = openapi.Parameter(
-        name="category",
-        in_=openapi.IN_QUERY,
-        description="Filter products by category. Use commas to specify multiple categories.",
-        type=openapi.TYPE_STRING,
-    )
-    MIN_PRICE = openapi.Parameter(
-        name="min_price",
-        in_=openapi.IN_QUERY,
-        description="Filter products by minimum price.",
-        type=openapi.TYPE_NUMBER,
-    )
-    MAX_PRICE = openapi.Parameter(
-        name="max_price",
-        in_=openapi.IN_QUERY,
-        description="Filter products by maximum price.",
-        type=openapi.TYPE_NUMBER,
-    )
-    NAME = openapi.Parameter(
-        name="name",
-        in_=openapi.IN_QUERY,
-        description="Filter products by name. Search is case-insensitive.",
-        type=openapi.TYPE_STRING,
-    )
-
-    @swagger_auto_schema(
-        operation_description="API endpoint for listing products with optional filters.",
-        manual_parameters=[CATEGORY, MIN_PRICE, MAX_PRICE, NAME],
-        responses={
-            200: openapi.Response(
-                "List of products.", ProductDetailSerializer(many=True)
-            )
-        },
+        try:
+            return self.action_serializers[self.action]
+        except KeyError:
+            raise ImproperlyConfigured(f"Serializer for {self.action=} is not exist")
+
+    @extend_schema(
+        description="API endpoint for listing products with optional filters.",
+        parameters=[
+            CATEGORY_PARAMETER,
+            MIN_PRICE_PARAMETER,
+            MAX_PRICE_PARAMETER,
+            NAME_PARAMETER,
+            STREAM_PARAMETER,
+        ],
+        responses={200: PRODUCT_LIST_RESPONSE},
         operation_id="ListProducts",
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        """
+        Lists products from plain database rows instead of running a serializer per product.
+        The output matches ProductSearchSerializer.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *self.list_fields, "discounted_price"
+        )
+        if request.query_params.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(
+                self.stream_list(queryset), content_type="application/json"
+            )
+
+        page = self.paginate_queryset(queryset)
+        data = [self.to_list_item(row) for row in (queryset if page is None else page)]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    @staticmethod
+    def to_list_item(row: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "name": row["name"],
+            "price": float(row["price"]),
+            "discount": row["discount"],
+            "discounted_price": (
+                None
+                if row["discounted_price"] is None
+                else float(row["discounted_price"])
+            ),
+        }
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for retrieving a product by ID.",
-        responses={200: openapi.Response("Product details.", ProductDetailSerializer)},
+    def stream_list(self, queryset: QuerySet) -> Iterator[bytes]:
+        """
+        Encodes the whole unpaginated list as a JSON array, fetching rows from the database in chunks
+        and sending one block of encoded rows per chunk.
+        """
+        renderer = ORJSONRenderer()
+        buffer = []
+        separator = b"["
+        for row in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            buffer.append(separator + renderer.render(self.to_list_item(row)))
+            separator = b","
+            if len(buffer) == STREAM_CHUNK_SIZE:
+                yield b"".join(buffer)
+                buffer.clear()
+        buffer.append(b"]" if separator == b"," else b"[]")
+        yield b"".join(buffer)
+
+    @extend_schema(
+        description="API endpoint for retrieving a product by ID.",
+        responses={200: PRODUCT_DETAIL_RESPONSE},
         operation_id="RetrieveProductByID",
     )
     def retrieve(self, request, *args, **kwargs):
@@ -90,9 +218,11 @@ class CategorySearchAPIView(generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for listing categories.",
-        responses={200: openapi.Response("List of categories", CategorySerializer)},
+    @extend_schema(
+        description="API endpoint for listing categories.",
+        responses={
+            200: OpenApiResponse(CategorySerializer, description="List of categories")
+        },
         operation_id="ListCategories",
     )
     def list(self, request, *args, **kwargs):
@@ -107,10 +237,12 @@ class ProductCreateAPIView(generics.GenericAPIView):
     serializer_class = ProductSerializer
     permission_classes = (IsAdmin,)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for creating a new product.",
-        request_body=ProductSerializer,
-        responses={201: openapi.Response("Product created.", ProductSerializer)},
+    @extend_schema(
+        description="API endpoint for creating a new product.",
+        request=ProductSerializer,
+        responses={
+            201: OpenApiResponse(ProductSerializer, description="Product created.")
+        },
         operation_id="CreateProduct",
     )
     def post(self, request):
@@ -119,31 +251,88 @@ class ProductCreateAPIView(generics.GenericAPIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check the existence of the specified category
+        # The database enforces the category foreign key and the unique product name
         try:
-            category = Category.objects.get(id=serializer.validated_data["category_id"])
-        except ObjectDoesNotExist:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError as error:
+            return product_integrity_error_response(error, serializer.validated_data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ProductBulkCreateAPIView(generics.GenericAPIView):
+    """
+    A view for creating several products in one request.
+    """
+
+    serializer_class = ProductBulkCreateSerializer
+    permission_classes = (IsAdmin,)
+
+    @extend_schema(
+        description="API endpoint for creating several products at once. "
+        "Products whose names already exist or repeat within the request are skipped. "
+        "The response is 201 even when every product is skipped and 'created' is empty.",
+        request=ProductBulkCreateSerializer,
+        responses={
+            201: OpenApiResponse(
+                ProductBulkCreateResultSerializer,
+                description="Names of the created and of the skipped products.",
+            )
+        },
+        operation_id="BulkCreateProducts",
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        items = serializer.validated_data["items"]
+
+        # Check the existence of all referenced categories with a single query
+        category_ids = {item["category_id"] for item in items}
+        missing_category_ids = category_ids - set(
+            Category.objects.filter(id__in=category_ids).values_list("id", flat=True)
+        )
+        if missing_category_ids:
             return Response(
-                {"message": "This category doesn't exist."},
+                {
+                    "message": "These categories don't exist.",
+                    "category_ids": sorted(missing_category_ids),
+                },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check the existence of a product with the specified name
-        if Product.objects.filter(name=serializer.validated_data["name"]).exists():
+        # Skip names that are already taken or repeated within the request
+        existing_names = set(
+            Product.objects.filter(
+                name__in=[item["name"] for item in items]
+            ).values_list("name", flat=True)
+        )
+        products = {}
+        skipped = []
+        for item in items:
+            if item["name"] in existing_names or item["name"] in products:
+                skipped.append(item["name"])
+            else:
+                products[item["name"]] = Product(**item)
+
+        # All rows are written or none are, so "created" matches the stored rows
+        try:
+            with transaction.atomic():
+                Product.objects.bulk_create(
+                    products.values(), batch_size=BULK_CREATE_BATCH_SIZE
+                )
+        except IntegrityError:
+            # A concurrent request took one of the names after they were checked
+            if not Product.objects.filter(name__in=products).exists():
+                raise
             return Response(
                 {"message": "A product with the same name already exists."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        product = Product.objects.create(
-            name=serializer.validated_data["name"],
-            category=category,
-            price=serializer.validated_data["price"],
-            quantity=serializer.validated_data["quantity"],
-            discount=serializer.validated_data["discount"],
-            available=serializer.validated_data["available"],
-            cost_price=serializer.validated_data["cost_price"],
+        return Response(
+            {"created": list(products), "skipped": skipped},
+            status=status.HTTP_201_CREATED,
         )
-        return Response(ProductSerializer(product).data, status=status.HTTP_201_CREATED)
 
 
 class ProductDetailUpdateAPIView(
@@ -155,64 +344,91 @@ class ProductDetailUpdateAPIView(
 
     queryset = Product.objects.all()
     permission_classes = (IsAdmin,)
+    method_serializers = {
+        "put": ProductSerializer,
+        "patch": ProductPartialUpdateSerializer,
+        "get": ProductSerializer,
+    }
 
     def get_serializer_class(self):
         method = self.request.method.lower()
-        action_serializers_dict = {
-            "put": ProductSerializer,
-            "patch": ProductPartialUpdateSerializer,
-            "get": ProductSerializer,
-        }
-        serializer_class = action_serializers_dict.get(method)
-        if not serializer_class:
-            raise Exception(f"Serializer for {method=} does not exist.")
-        return serializer_class
-
-    @swagger_auto_schema(
-        operation_description="API endpoint for retrieving a product by ID.",
-        responses={200: openapi.Response("Product details.", ProductSerializer)},
+        try:
+            return self.method_serializers[method]
+        except KeyError:
+            raise ImproperlyConfigured(f"Serializer for {method=} does not exist.")
+
+    @extend_schema(
+        description="API endpoint for retrieving a product by ID.",
+        responses={
+            200: OpenApiResponse(ProductSerializer, description="Product details.")
+        },
         operation_id="RetrieveProductByIDStaff",
     )
     def get(self, request, *args, **kwargs):
         return self.retrieve(request, *args, **kwargs)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for updating a product by ID.",
-        responses={200: openapi.Response("Product updated.", ProductSerializer)},
+    @extend_schema(
+        description="API endpoint for updating a product by ID.",
+        responses={
+            200: OpenApiResponse(ProductSerializer, description="Product updated.")
+        },
         operation_id="UpdateProduct",
     )
     def put(self, request, **kwargs):
         return self.update_product(request, **kwargs)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for partially updating a product by ID.",
-        responses={200: openapi.Response("Product updated.", ProductSerializer)},
+    @extend_schema(
+        description="API endpoint for partially updating a product by ID.",
+        responses={
+            200: OpenApiResponse(ProductSerializer, description="Product updated.")
+        },
         operation_id="PartialUpdateProduct",
     )
     def patch(self, request, **kwargs):
         return self.update_product(request, **kwargs, partial=True)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for deleting a product.",
-        responses={204: openapi.Response("Product deleted.")},
+    @extend_schema(
+        description="API endpoint for deleting a product.",
+        responses={204: OpenApiResponse(description="Product deleted.")},
         operation_id="DeleteProduct",
     )
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
 
+    def get_object_for_update(self, pk: int) -> Product:
+        """
+        Loads the product and locks its row until the end of the current transaction.
+        """
+        try:
+            instance = Product.objects.select_for_update().get(pk=pk)
+        except Product.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
     def update_product(self, request, **kwargs):
-        instance = self.get_object()
         partial = kwargs.pop("partial", False)
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        for attr, value in serializer.validated_data.items():
-            setattr(instance, attr, value)
+        # Concurrent updates of the same product are applied one after another
+        try:
+            with transaction.atomic():
+                instance = self.get_object_for_update(kwargs["pk"])
+                serializer = self.get_serializer(
+                    instance, data=request.data, partial=partial
+                )
+                if not serializer.is_valid():
+                    return Response(
+                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
+                    )
+                serializer.save()
+        except IntegrityError as error:
+            return product_integrity_error_response(
+                error, serializer.validated_data, kwargs["pk"]
+            )
 
-        instance.save()
-        return Response(ProductSerializer(instance).data, status=status.HTTP_200_OK)
+        if partial:
+            # The partial update serializer declares only the writable fields
+            return Response(ProductSerializer(instance).data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class CategoryCreateAPIView(generics.GenericAPIView):
@@ -224,29 +440,31 @@ class CategoryCreateAPIView(generics.GenericAPIView):
     serializer_class = CategorySerializer
     permission_classes = (IsAdmin,)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for creating a new category.",
+    @extend_schema(
+        description="API endpoint for creating a new category.",
         operation_id="CreateCategory",
-        request_body=CategorySerializer,
-        responses={201: openapi.Response("Category.", CategorySerializer)},
+        request=CategorySerializer,
+        responses={201: OpenApiResponse(CategorySerializer, description="Category.")},
     )
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        category_name = serializer.validated_data["name"]
+        # The unique constraint on the category name rejects duplicates
         try:
-            Category.objects.get(name=category_name)
+            with transaction.atomic():
+                category = Category.objects.create(
+                    name=serializer.validated_data["name"]
+                )
+        except IntegrityError:
             return Response(
                 {"message": "A category with the same name already exists."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        except ObjectDoesNotExist:
-            category = Category.objects.create(name=category_name)
-            return Response(
-                CategorySerializer(category).data, status=status.HTTP_201_CREATED
-            )
+        return Response(
+            CategorySerializer(category).data, status=status.HTTP_201_CREATED
+        )
 
 
 class CategoryDetailAPIView(generics.RetrieveDestroyAPIView):
@@ -258,18 +476,20 @@ class CategoryDetailAPIView(generics.RetrieveDestroyAPIView):
     serializer_class = CategorySerializer
     permission_classes = (IsAdmin, IsAuthenticated)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for retrieving a category by ID.",
-        responses={200: openapi.Response("Category details.", ProductSerializer)},
-        operation_id="RetrieveProductByIDStaff",
+    @extend_schema(
+        description="API endpoint for retrieving a category by ID.",
+        responses={
+            200: OpenApiResponse(CategorySerializer, description="Category details.")
+        },
+        operation_id="RetrieveCategoryByIDStaff",
     )
     def get(self, request, *args, **kwargs):
         return self.retrieve(request, *args, **kwargs)
 
-    @swagger_auto_schema(
-        operation_description="API endpoint for deleting a category by ID.",
+    @extend_schema(
+        description="API endpoint for deleting a category by ID.",
         operation_id="DeleteCategoryByIDStaff",
-        responses={204: openapi.Response(description="Category deleted successfully.")},
+        responses={204: OpenApiResponse(description="Category deleted successfully.")},
     )
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
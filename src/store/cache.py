@@ -0,0 +1,25 @@
+from django.core.cache import cache
+
+from config.constants import CATEGORY_NAME_MAP_TIMEOUT
+from store.models import Category
+
+CATEGORY_NAME_MAP_KEY = "category_name_map"
+
+
+def get_category_name_map() -> dict[int, str]:
+    """
+    Returns the names of all categories keyed by ID, loading them into the cache on a miss.
+
+    With the default per-process LocMemCache, a category change only clears the cache of the
+    process that made it. Other worker processes can show the old names for up to
+    CATEGORY_NAME_MAP_TIMEOUT seconds, unless CACHES points to a shared backend such as Redis.
+    """
+    category_names = cache.get(CATEGORY_NAME_MAP_KEY)
+    if category_names is None:
+        category_names = dict(Category.objects.values_list("id", "name"))
+        cache.set(CATEGORY_NAME_MAP_KEY, category_names, CATEGORY_NAME_MAP_TIMEOUT)
+    return category_names
+
+
+def invalidate_category_name_map() -> None:
+    cache.delete(CATEGORY_NAME_MAP_KEY)
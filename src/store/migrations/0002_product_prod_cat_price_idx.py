@@ -0,0 +1,16 @@
+# Generated by Django 5.0.4 on 2026-10-15 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["category", "price"], name="prod_cat_price_idx"),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Category(models.Model):
@@ -39,3 +41,11 @@ class Product(models.Model):
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ("id",)
+        indexes = [
+            models.Index(fields=["category", "price"], name="prod_cat_price_idx"),
+            # Matches the UPPER() expression that the icontains lookup compiles to on PostgreSQL
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="prod_name_upper_trgm_idx",
+            ),
+        ]
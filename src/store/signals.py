@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from store.cache import invalidate_category_name_map
+from store.models import Category
+
+
+# Drop the cached category names whenever a category is created, renamed or deleted.
+# The cache is cleared after the commit so no request can cache names from before the change.
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_name_map(**kwargs) -> None:
+    transaction.on_commit(invalidate_category_name_map)
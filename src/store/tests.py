@@ -0,0 +1,274 @@
+from unittest import mock
+
+import orjson
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from config.constants import BULK_CREATE_MAX_ITEMS
+from mixins import CachedFieldsMixin
+from store.api.renderers import ORJSONRenderer
+from store.api.serializers import CategorySerializer, ProductSearchSerializer
+from store.api.views import DISCOUNTED_PRICE
+from store.cache import get_category_name_map
+from store.models import Category, Product
+from users.models import User
+
+
+class ProductSearchQueryCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        categories = [Category.objects.create(name=f"Category {i}") for i in range(3)]
+        cls.products = [
+            Product.objects.create(
+                name=f"Product {i}",
+                category=categories[i % 3],
+                price="10.00",
+                cost_price="5.00",
+                discount=10 if i % 2 else 0,
+            )
+            for i in range(15)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_uses_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("products-search-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_list_items_match_search_serializer(self):
+        response = self.client.get(reverse("products-search-list"))
+        items = response.data["results"]
+        products = Product.objects.annotate(discounted_price=DISCOUNTED_PRICE)
+        for item, product in zip(items, products.order_by("id")):
+            expected = ProductSearchSerializer(product).data
+            self.assertEqual(list(item), list(expected))
+            self.assertEqual(item, expected)
+            self.assertIsInstance(item["price"], float)
+        self.assertIsNone(items[0]["discounted_price"])
+        self.assertIsInstance(items[1]["discounted_price"], float)
+        self.assertEqual(items[1]["discounted_price"], 9.0)
+
+    def test_retrieve_does_not_join_category(self):
+        url = reverse("products-search-detail", args=[self.products[1].pk])
+        # The first request also loads the cached category names
+        with self.assertNumQueries(2):
+            self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["category"], "Category 1")
+        self.assertEqual(response.data["discounted_price"], 9.0)
+
+    def test_discounted_price_is_null_without_discount(self):
+        response = self.client.get(
+            reverse("products-search-detail", args=[self.products[0].pk])
+        )
+        self.assertIsNone(response.data["discounted_price"])
+
+    def test_stream_yields_one_block_per_chunk(self):
+        with mock.patch("store.api.views.STREAM_CHUNK_SIZE", 4):
+            response = self.client.get(reverse("products-search-list"), {"stream": "1"})
+            blocks = list(response.streaming_content)
+        self.assertEqual(len(blocks), 4)
+        items = orjson.loads(b"".join(blocks))
+        self.assertEqual(
+            [item["name"] for item in items], [p.name for p in self.products]
+        )
+
+
+class CategoryNameMapTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_is_cleared_after_commit(self):
+        category = Category.objects.create(name="Old")
+        get_category_name_map()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            category.name = "New"
+            category.save()
+            # The rename is not committed yet, so the cached names stay
+            self.assertEqual(get_category_name_map()[category.pk], "Old")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_category_name_map()[category.pk], "New")
+
+
+class CachedFieldsMixinTests(SimpleTestCase):
+    def test_fields_are_built_once_per_class(self):
+        CachedFieldsMixin._fields_cache.pop(CategorySerializer, None)
+        get_fields = serializers.Serializer.get_fields
+        with mock.patch.object(
+            serializers.Serializer, "get_fields", autospec=True, side_effect=get_fields
+        ) as mocked_get_fields:
+            instances = [CategorySerializer() for _ in range(1000)]
+            for instance in instances:
+                self.assertEqual(list(instance.fields), ["id", "name"])
+
+        mocked_get_fields.assert_called_once()
+        # Every instance binds its own copy of each field
+        first, second = instances[:2]
+        self.assertIsNot(first.fields["name"], second.fields["name"])
+        self.assertIs(first.fields["name"].parent, first)
+
+
+# Signs in an admin and creates a category with a product named "Taken".
+class ProductWriteTestMixin:
+    def setUp(self):
+        self.client.force_authenticate(
+            User.objects.create(username="admin", role=User.ADMIN)
+        )
+        self.category = Category.objects.create(name="Category")
+        self.product = Product.objects.create(
+            name="Taken", category=self.category, price="10.00", cost_price="5.00"
+        )
+
+    def product_data(self, **overrides):
+        return {
+            "name": "Free",
+            "category_id": self.category.pk,
+            "price": "10.00",
+            "quantity": 1,
+            "cost_price": "5.00",
+            **overrides,
+        }
+
+
+# Foreign keys are checked when the transaction commits, so these tests need real commits.
+class ProductWriteIntegrityTests(ProductWriteTestMixin, APITransactionTestCase):
+    def test_create_with_taken_name(self):
+        response = self.client.post(
+            reverse("product-create"), self.product_data(name="Taken"), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["message"], "A product with the same name already exists."
+        )
+
+    def test_create_with_missing_category(self):
+        response = self.client.post(
+            reverse("product-create"),
+            self.product_data(category_id=self.category.pk + 100),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["message"], "This category doesn't exist.")
+        self.assertFalse(Product.objects.filter(name="Free").exists())
+
+    def test_create_with_negative_quantity(self):
+        response = self.client.post(
+            reverse("product-create"), self.product_data(quantity=-1), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("quantity", response.data)
+
+    def test_unexplained_integrity_error_is_raised(self):
+        with mock.patch(
+            "store.api.serializers.Product.objects.create",
+            side_effect=IntegrityError("check constraint"),
+        ):
+            with self.assertRaises(IntegrityError):
+                self.client.post(
+                    reverse("product-create"), self.product_data(), format="json"
+                )
+
+    def test_update_with_taken_name(self):
+        other = Product.objects.create(
+            name="Other", category=self.category, price="10.00", cost_price="5.00"
+        )
+        response = self.client.patch(
+            reverse("product-detail-update-destroy", args=[other.pk]),
+            {"name": "Taken"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["message"], "A product with the same name already exists."
+        )
+
+    def test_update_keeping_own_name_with_missing_category(self):
+        response = self.client.put(
+            reverse("product-detail-update-destroy", args=[self.product.pk]),
+            self.product_data(name="Taken", category_id=self.category.pk + 100),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["message"], "This category doesn't exist.")
+
+
+class ProductBulkCreateTests(ProductWriteTestMixin, APITestCase):
+    def test_creates_new_and_skips_taken_and_repeated_names(self):
+        items = [
+            self.product_data(name="b1"),
+            self.product_data(name="b1"),
+            self.product_data(name="Taken"),
+            self.product_data(name="b2"),
+        ]
+        response = self.client.post(
+            reverse("product-bulk-create"), {"items": items}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], ["b1", "b2"])
+        self.assertEqual(response.data["skipped"], ["b1", "Taken"])
+        self.assertEqual(
+            set(Product.objects.values_list("name", flat=True)), {"Taken", "b1", "b2"}
+        )
+
+    def test_all_skipped_still_returns_created(self):
+        response = self.client.post(
+            reverse("product-bulk-create"),
+            {"items": [self.product_data(name="Taken")]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"created": [], "skipped": ["Taken"]})
+
+    def test_rejects_too_many_items(self):
+        items = [
+            self.product_data(name=f"b{i}") for i in range(BULK_CREATE_MAX_ITEMS + 1)
+        ]
+        response = self.client.post(
+            reverse("product-bulk-create"), {"items": items}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("items", response.data)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_rejects_negative_quantity(self):
+        response = self.client.post(
+            reverse("product-bulk-create"),
+            {"items": [self.product_data(name="n1", quantity=-1)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Product.objects.filter(name="n1").exists())
+
+    def test_rejects_missing_categories(self):
+        missing_id = self.category.pk + 100
+        response = self.client.post(
+            reverse("product-bulk-create"),
+            {"items": [self.product_data(name="b1", category_id=missing_id)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["category_ids"], [missing_id])
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_renders_non_string_keys(self):
+        errors = {"tags": {0: ["Not a valid string."]}}
+        self.assertEqual(
+            ORJSONRenderer().render(errors),
+            b'{"tags":{"0":["Not a valid string."]}}',
+        )
+
+    def test_escapes_line_separators_like_json_renderer(self):
+        data = {"s": "a\u2028b\u2029c"}
+        self.assertEqual(ORJSONRenderer().render(data), b'{"s":"a\\u2028b\\u2029c"}')
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
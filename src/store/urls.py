@@ -3,6 +3,7 @@ from django.urls import path, include
 from store.api.router import router
 from store.api.views import (
     ProductCreateAPIView,
+    ProductBulkCreateAPIView,
     ProductDetailUpdateAPIView,
     CategoryCreateAPIView,
     CategoryDetailAPIView,
@@ -20,6 +21,11 @@ urlpatterns = [
                 path(
                     "products/", ProductCreateAPIView.as_view(), name="product-create"
                 ),
+                path(
+                    "products/bulk/",
+                    ProductBulkCreateAPIView.as_view(),
+                    name="product-bulk-create",
+                ),
                 path(
                     "products/<int:pk>/",
                     ProductDetailUpdateAPIView.as_view(),
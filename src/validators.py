@@ -7,9 +7,9 @@ def validate_price(cost_price: Decimal, price: Decimal, discount: int) -> None:
     """
     Validates the product price after applying a discount to ensure it does not fall below its cost price.
     """
-    # Calculate the minimum acceptable price after discount
-    min_acceptable_price = cost_price * LOSS_FACTOR
-    price_after_discount = price * (1 - Decimal(discount) / 100)
+    # Both sides are scaled by 100 so the discount is applied with integer operands only
+    min_acceptable_price = cost_price * LOSS_FACTOR * 100
+    price_after_discount = price * (100 - discount)
 
     # Check if the price is below the cost price
     if price < cost_price: